@@ -1,6 +1,6 @@
 import sys
-import copy
 import collections
+import functools
 import itertools
 import time
 import random
@@ -8,14 +8,19 @@ import difflib
 import os
 import re
 import json
+import pickle
+import hashlib
 import platform
 import math
 import threading
+import types
 import signal
 import shutil
+import textwrap
 import tty
 import termios
 import select
+import zlib
 from datetime import datetime
 
 class Constants:
@@ -23,6 +28,8 @@ class Constants:
     SCREEN_MIN_HEIGHT = 40
     TICK_RATE = 0.05
     CURSOR_BLINK_RATE = 0.5
+    CLEAR = '\033[2J\033[H'
+    VERSION = '1.0'
     
     PALETTE_NEON = {
         'background': '\033[48;2;10;10;15m',
@@ -62,6 +69,11 @@ class Constants:
         'underline': '\033[4m'
     }
 
+    for _palette in (PALETTE_NEON, PALETTE_SOLARIZED_LIGHT):
+        for _key, _value in _palette.items():
+            _palette[_key] = sys.intern(_value)
+    del _palette, _key, _value
+
     THEMES = {
         'Neon Night': PALETTE_NEON,
         'Solarized Light': PALETTE_SOLARIZED_LIGHT
@@ -84,38 +96,92 @@ class Constants:
     }
 
 class ScreenBuffer:
+    _pool = []
+    _POOL_CAP = 8
+
+    _CHAR_MASK = 0xFFFFFFFF
+    _BLANK = ord(' ')
+
     def __init__(self, width, height):
         self.width = width
         self.height = height
 
-        self.buffer = [[' ' for _ in range(width)] for _ in range(height)]
-        self.styles = [[Constants.CURRENT_PALETTE['reset'] for _ in range(width)] for _ in range(height)]
+        self._style_index = {Constants.CURRENT_PALETTE['reset']: 0}
+        self._style_bytes = [Constants.CURRENT_PALETTE['reset'].encode()]
 
-        self.prev_buffer = [['' for _ in range(width)] for _ in range(height)]
-        self.prev_styles = [['' for _ in range(width)] for _ in range(height)]
+        size = width * height
+        self.cells = ScreenBuffer._grid(size, ScreenBuffer._BLANK)
+        self.prev_cells = ScreenBuffer._grid(size, -1)
+        self.cursor_codes = ScreenBuffer._cursor_table(width, height)
         self.force_redraw = True
 
+    def _style_idx(self, style):
+        idx = self._style_index.get(style)
+        if idx is None:
+            idx = len(self._style_bytes)
+            self._style_index[style] = idx
+            self._style_bytes.append(style.encode())
+        return idx
+
+    @staticmethod
+    def _cursor_table(w, h):
+        return [f'\033[{y};{x}H'.encode() for y in range(1, h + 1) for x in range(1, w + 1)]
+
+    @staticmethod
+    def _grid(size, value):
+        pool = ScreenBuffer._pool
+        for idx, grid in enumerate(pool):
+            if len(grid) >= size:
+                del pool[idx]
+                del grid[size:]
+                grid[:] = [value] * size
+                return grid
+        return [value] * size
+
     def resize(self, w, h):
         if self.width == w and self.height == h: return
         self.width = w
         self.height = h
-        self.buffer = [[' ' for _ in range(w)] for _ in range(h)]
-        self.styles = [[Constants.CURRENT_PALETTE['reset'] for _ in range(w)] for _ in range(h)]
-        self.prev_buffer = [['' for _ in range(w)] for _ in range(h)]
-        self.prev_styles = [['' for _ in range(w)] for _ in range(h)]
+        size = w * h
+        if size <= len(self.cells):
+            self.cells[:] = [ScreenBuffer._BLANK] * size
+            self.prev_cells[:] = [-1] * size
+        else:
+            pool = ScreenBuffer._pool
+            for grid in (self.cells, self.prev_cells):
+                if len(pool) < ScreenBuffer._POOL_CAP:
+                    pool.append(grid)
+            self.cells = ScreenBuffer._grid(size, ScreenBuffer._BLANK)
+            self.prev_cells = ScreenBuffer._grid(size, -1)
+        self.cursor_codes = ScreenBuffer._cursor_table(w, h)
         self.force_redraw = True
-        sys.stdout.write('\033[2J') 
+        sys.stdout.buffer.write(b'\033[2J')
 
     def put_char(self, x, y, char, style=None):
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.buffer[y][x] = char
-            if style: self.styles[y][x] = style
+            i = y * self.width + x
+            if style:
+                self.cells[i] = (self._style_idx(style) << 32) | ord(char)
+            else:
+                self.cells[i] = (self.cells[i] & ~ScreenBuffer._CHAR_MASK) | ord(char)
 
     def put_string(self, x, y, text, style=None, max_width=None):
         if y < 0 or y >= self.height: return
         if max_width: text = text[:max_width]
-        for i, char in enumerate(text):
-            self.put_char(x + i, y, char, style)
+        if x < 0:
+            text = text[-x:]
+            x = 0
+        end = min(x + len(text), self.width)
+        if end <= x: return
+        text = text[:end - x]
+        cells = self.cells
+        s = y * self.width + x
+        if style:
+            prefix = self._style_idx(style) << 32
+            cells[s:s + len(text)] = [prefix | ord(c) for c in text]
+        else:
+            mask = ~ScreenBuffer._CHAR_MASK
+            cells[s:s + len(text)] = [(cells[s + i] & mask) | ord(c) for i, c in enumerate(text)]
 
     def draw_box(self, x, y, w, h, style=None, double=False, title=None):
         s = Constants.SYMBOLS
@@ -127,10 +193,11 @@ class ScreenBuffer:
         self.put_char(x, y + h - 1, bl, style)
         self.put_char(x + w - 1, y + h - 1, br, style)
         
-        for i in range(1, w - 1):
-            self.put_char(x + i, y, h_line, style)
-            self.put_char(x + i, y + h - 1, h_line, style)
-            
+        if w > 2:
+            edge = h_line * (w - 2)
+            self.put_string(x + 1, y, edge, style)
+            self.put_string(x + 1, y + h - 1, edge, style)
+
         for i in range(1, h - 1):
             self.put_char(x, y + i, v_line, style)
             self.put_char(x + w - 1, y + i, v_line, style)
@@ -141,48 +208,87 @@ class ScreenBuffer:
             self.put_string(x + offset, y, title, style)
 
     def fill_rect(self, x, y, w, h, char=' ', style=None):
-        for i in range(h):
-            for j in range(w):
-                self.put_char(x + j, y + i, char, style)
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1: return
+        span = x1 - x0
+        cells = self.cells
+        if style:
+            row_cells = [(self._style_idx(style) << 32) | ord(char)] * span
+            for row in range(y0, y1):
+                s = row * self.width + x0
+                cells[s:s + span] = row_cells
+        else:
+            code = ord(char)
+            mask = ~ScreenBuffer._CHAR_MASK
+            for row in range(y0, y1):
+                s = row * self.width + x0
+                cells[s:s + span] = [(c & mask) | code for c in cells[s:s + span]]
 
     def render(self):
-        output = []
-        current_style = ''
-        
+        out = sys.stdout.buffer
+        cells = self.cells
+        prev = self.prev_cells
+        style_bytes = self._style_bytes
+        char_mask = ScreenBuffer._CHAR_MASK
+
+        if not self.force_redraw and cells == prev:
+            out.write(b'\033[?25l')
+            out.flush()
+            return
+
+        output = bytearray(b'\033[?25l')
+        current_idx = -1
 
-        output.append('\033[?25l') 
-        
         for y in range(self.height):
+            base = y * self.width
+            end = base + self.width
+            if not self.force_redraw and cells[base:end] == prev[base:end]:
+                continue
+
+            last_x = -2
             for x in range(self.width):
-                char = self.buffer[y][x]
-                style = self.styles[y][x]
-                
-                
-                if not self.force_redraw:
-                    if char == self.prev_buffer[y][x] and style == self.prev_styles[y][x]:
-                        continue
-                
+                i = base + x
+                cell = cells[i]
 
-                output.append(f'\033[{y+1};{x+1}H')
-                
-      
-                if style != current_style:
-                    output.append(style)
-                    current_style = style
-                
-                output.append(char)
-                
 
-                self.prev_buffer[y][x] = char
-                self.prev_styles[y][x] = style
-        
+                if not self.force_redraw and cell == prev[i]:
+                    continue
+
+
+                if x != last_x + 1:
+                    output += self.cursor_codes[i]
+                last_x = x
+
+
+                idx = cell >> 32
+                if idx != current_idx:
+                    output += style_bytes[idx]
+                    current_idx = idx
+
+                output += chr(cell & char_mask).encode()
+
+
+                prev[i] = cell
+
         self.force_redraw = False
-        sys.stdout.write("".join(output))
-        sys.stdout.flush()
+        out.write(bytes(output))
+        out.flush()
 
 class InputSystem:
+    _ESC_MAP = {
+        '[A': 'UP', '[B': 'DOWN', '[C': 'RIGHT', '[D': 'LEFT',
+        '[5~': 'PAGE_UP', '[6~': 'PAGE_DOWN',
+        '[11~': 'F1', '[12~': 'F2', '[13~': 'F3',
+        'OP': 'F1', 'OQ': 'F2', 'OR': 'F3',
+        'OA': 'UP', 'OB': 'DOWN', 'OC': 'RIGHT', 'OD': 'LEFT',
+    }
+
     def __init__(self):
         self.keys = []
+        self.key_event = threading.Event()
         self.running = False
         self.thread = None
         self.old_settings = None
@@ -203,64 +309,50 @@ class InputSystem:
 
     def _listen(self):
         fd = sys.stdin.fileno()
+        esc_map = InputSystem._ESC_MAP
         while self.running:
             if select.select([fd], [], [], 0.1)[0]:
                 try:
-                    k = os.read(fd, 1).decode(errors='ignore')
+                    data = os.read(fd, 64).decode(errors='ignore')
                 except OSError:
                     continue
-                    
-                if k == '\x1b':
-                  
-                    if select.select([fd], [], [], 0.1)[0]:
-                        k2 = os.read(fd, 1).decode(errors='ignore')
-                        if k2 == '[':
-                            k3 = os.read(fd, 1).decode(errors='ignore')
-                            if k3 == 'A': self.keys.append('UP')
-                            elif k3 == 'B': self.keys.append('DOWN')
-                            elif k3 == 'C': self.keys.append('RIGHT')
-                            elif k3 == 'D': self.keys.append('LEFT')
-                            elif k3 == '1': 
-                                if select.select([fd], [], [], 0.1)[0]:
-                                    k4 = os.read(fd, 1).decode(errors='ignore')
-                                    if k4 == '1':
-                                         if select.select([fd], [], [], 0.1)[0]:
-                                             if os.read(fd, 1).decode(errors='ignore') == '~': self.keys.append('F1')
-                                    elif k4 == '2':
-                                        if select.select([fd], [], [], 0.1)[0]:
-                                            if os.read(fd, 1).decode(errors='ignore') == '~': self.keys.append('F2')
-                                    elif k4 == '3':
-                                        if select.select([fd], [], [], 0.1)[0]:
-                                            if os.read(fd, 1).decode(errors='ignore') == '~': self.keys.append('F3')
-                            elif k3 == '5':
-                                if select.select([fd], [], [], 0.1)[0]:
-                                    if os.read(fd, 1).decode(errors='ignore') == '~': self.keys.append('PAGE_UP')
-                            elif k3 == '6':
-                                if select.select([fd], [], [], 0.1)[0]:
-                                    if os.read(fd, 1).decode(errors='ignore') == '~': self.keys.append('PAGE_DOWN')
-                            else:
 
+                pos = 0
+                end = len(data)
+                while pos < end:
+                    k = data[pos]
+                    pos += 1
+
+                    if k == '\x1b':
+                        if pos >= end and select.select([fd], [], [], 0.1)[0]:
+                            try:
+                                data += os.read(fd, 8).decode(errors='ignore')
+                                end = len(data)
+                            except OSError:
                                 pass
-                        elif k2 == 'O': 
-                            if select.select([fd], [], [], 0.1)[0]:
-                                k3 = os.read(fd, 1).decode(errors='ignore')
-                                if k3 == 'P': self.keys.append('F1')
-                                elif k3 == 'Q': self.keys.append('F2')
-                                elif k3 == 'R': self.keys.append('F3')
-                                elif k3 == 'A': self.keys.append('UP')
-                                elif k3 == 'B': self.keys.append('DOWN')
-                                elif k3 == 'C': self.keys.append('RIGHT')
-                                elif k3 == 'D': self.keys.append('LEFT')
+                        key = None
+                        for n in (4, 3, 2):
+                            key = esc_map.get(data[pos:pos + n])
+                            if key:
+                                pos += n
+                                break
+                        if key:
+                            self.keys.append(key)
+                        elif pos >= end:
+                            self.keys.append('ESCAPE')
+                        elif data[pos] in '[O':
+                            pos += 2
                         else:
-
                             self.keys.append('ESCAPE')
-                            self.keys.append(k2)
-                    else:
-                        self.keys.append('ESCAPE')
-                elif k == '\x03': self.keys.append('CTRL_C')
-                elif k == '\r': self.keys.append('ENTER')
-                elif k == '\x7f': self.keys.append('BACKSPACE')
-                else: self.keys.append(k)
+                            self.keys.append(data[pos])
+                            pos += 1
+                    elif k == '\x03': self.keys.append('CTRL_C')
+                    elif k == '\r': self.keys.append('ENTER')
+                    elif k == '\x7f': self.keys.append('BACKSPACE')
+                    else: self.keys.append(k)
+
+                if self.keys:
+                    self.key_event.set()
 
     def get_key(self):
         return self.keys.pop(0) if self.keys else None
@@ -388,12 +480,18 @@ class TextDisplay(Widget):
         self.lines = content.split('\n')
         self.scroll_offset = 0
         self.wrap = True
+        self._wrapped_text = None
+        self._wrapped_width = None
 
     def set_content(self, text):
         if self.wrap:
-            self.lines = Utils.wrap_text(text, self.width - 2)
+            if text is not self._wrapped_text or self._wrapped_width != self.width:
+                self.lines = Utils.wrap_text(text, self.width - 2)
+                self._wrapped_text = text
+                self._wrapped_width = self.width
         else:
             self.lines = text.split('\n')
+            self._wrapped_text = None
         self.scroll_offset = 0
 
     def on_key(self, key):
@@ -456,10 +554,14 @@ class StatusBar(Widget):
         buffer.put_string(x, y, text, fg)
 
 class Type:
+    __slots__ = ()
+
     def __repr__(self):
         return self.__str__()
 
 class TypeVariable(Type):
+    __slots__ = ('name',)
+
     def __init__(self, name):
         self.name = name
     
@@ -473,6 +575,8 @@ class TypeVariable(Type):
         return hash(self.name)
 
 class TypeConstructor(Type):
+    __slots__ = ('name', 'types')
+
     def __init__(self, name, types=None):
         self.name = name
         self.types = types if types else []
@@ -500,21 +604,43 @@ class TypeInferenceEngine:
         
     def apply_substitution(self, t):
         if isinstance(t, TypeVariable):
-            if t.name in self.substitution:
-                return self.apply_substitution(self.substitution[t.name])
-            return t
+            subst = self.substitution
+            chain = []
+            while isinstance(t, TypeVariable) and t.name in subst:
+                chain.append(t.name)
+                t = subst[t.name]
+            for name in chain:
+                subst[name] = t
         if isinstance(t, TypeConstructor):
             return TypeConstructor(t.name, [self.apply_substitution(x) for x in t.types])
         return t
-        
+
+    def occurs_in(self, name, t):
+        subst = self.substitution
+        stack = [t]
+        while stack:
+            current = stack.pop()
+            while isinstance(current, TypeVariable) and current.name in subst:
+                current = subst[current.name]
+            if isinstance(current, TypeVariable):
+                if current.name == name:
+                    return True
+            elif isinstance(current, TypeConstructor):
+                stack.extend(current.types)
+        return False
+
     def unify_types(self, t1, t2):
         t1 = self.apply_substitution(t1)
         t2 = self.apply_substitution(t2)
         
         if isinstance(t1, TypeVariable):
             if t1 != t2:
+                if self.occurs_in(t1.name, t2):
+                    raise TypeError(f"Type Mismatch Error: Cannot construct infinite type {t1} = {t2}")
                 self.substitution[t1.name] = t2
         elif isinstance(t2, TypeVariable):
+            if self.occurs_in(t2.name, t1):
+                raise TypeError(f"Type Mismatch Error: Cannot construct infinite type {t2} = {t1}")
             self.substitution[t2.name] = t1
         elif isinstance(t1, TypeConstructor) and isinstance(t2, TypeConstructor):
             if t1.name != t2.name or len(t1.types) != len(t2.types):
@@ -566,183 +692,387 @@ class TypeInferenceEngine:
         return rec(t)
 
 class Term:
+    __slots__ = ()
+
     def __repr__(self):
         return str(self)
-        
+
 class Variable(Term):
+    __slots__ = ('name', '_fv')
+    _cache = {}
+
     def __init__(self, name):
-        self.name = name
+        self.name = sys.intern(name)
+        self._fv = None
+
+    @classmethod
+    def intern(cls, name):
+        v = cls._cache.get(name)
+        if v is None:
+            v = cls._cache[name] = cls(name)
+        return v
     def __str__(self):
         return self.name
     def __eq__(self, other):
         return isinstance(other, Variable) and self.name == other.name
     def __hash__(self):
         return hash(self.name)
+    def __reduce__(self):
+        return (Variable.intern, (self.name,))
 
 class Application(Term):
+    __slots__ = ('left', 'right', '_fv', '_hash', '_str')
+
     def __init__(self, left, right):
         self.left = left
         self.right = right
+        self._fv = None
+        self._hash = hash((left, right))
+        self._str = None
     def __str__(self):
-        l = str(self.left)
-        r = str(self.right)
-        if isinstance(self.left, Abstraction): l = f"({l})"
-        if isinstance(self.right, Application): r = f"({r})"
-        return f"{l} {r}"
+        if self._str is None:
+            l = str(self.left)
+            r = str(self.right)
+            if isinstance(self.left, Abstraction): l = f"({l})"
+            if isinstance(self.right, Application): r = f"({r})"
+            self._str = f"{l} {r}"
+        return self._str
     def __eq__(self, other):
         return isinstance(other, Application) and self.left == other.left and self.right == other.right
     def __hash__(self):
-        return hash((self.left, self.right))
+        return self._hash
+    def __reduce__(self):
+        # Rebuild through __init__ so the cached hash is recomputed in the
+        # unpickling process (string hashes differ across interpreter runs).
+        return (Application, (self.left, self.right))
 
 class Abstraction(Term):
+    __slots__ = ('parameter', 'body', '_fv', '_hash', '_str')
+
     def __init__(self, parameter, body):
         self.parameter = parameter
         self.body = body
+        self._fv = None
+        self._hash = hash((parameter, body))
+        self._str = None
     def __str__(self):
-        return f"(\u03bb{self.parameter}. {self.body})"
+        if self._str is None:
+            self._str = f"(\u03bb{self.parameter}. {self.body})"
+        return self._str
     def __eq__(self, other):
         return isinstance(other, Abstraction) and self.parameter == other.parameter and self.body == other.body
     def __hash__(self):
-        return hash((self.parameter, self.body))
+        return self._hash
+    def __reduce__(self):
+        return (Abstraction, (self.parameter, self.body))
 
 class Parser:
+    _TOKEN_RE = re.compile(r'[()\\.=]|[^\s()\\.=]+')
+    _COMMENT_RE = re.compile(r'#.*')
+    _STOP_TOKENS = frozenset((')', ']', '}', '='))
+    _NUMERALS = {}
+
     def __init__(self):
         self.macros = {}
-        
+        self._tokens = []
+        self._pos = 0
+
     def tokenize(self, text):
-        text = re.sub(r'#.*', '', text) 
-        text = text.replace('(', ' ( ').replace(')', ' ) ').replace('.', ' . ').replace('\\', ' \\ ').replace('=', ' = ')
-        return [t for t in text.split() if t.strip()]
+        text = Parser._COMMENT_RE.sub('', text)
+        return Parser._TOKEN_RE.findall(text)
 
     def parse(self, text):
         tokens = self.tokenize(text)
         if not tokens: return None
-        return self.parse_expression(tokens)
-
-    def parse_expression(self, tokens):
-        left = self.parse_term(tokens)
-        while tokens and tokens[0] not in (')', ']', '}'):
-            if tokens[0] == '=': break 
-            right = self.parse_term(tokens)
+        # Parsing a macro body may trigger a nested parse of another macro,
+        # so save and restore the cursor state around this call.
+        saved = (self._tokens, self._pos)
+        self._tokens = tokens
+        self._pos = 0
+        try:
+            return self.parse_expression()
+        finally:
+            self._tokens, self._pos = saved
+
+    def parse_expression(self):
+        left = self.parse_term()
+        tokens = self._tokens
+        end = len(tokens)
+        stop = Parser._STOP_TOKENS
+        while self._pos < end and tokens[self._pos] not in stop:
+            right = self.parse_term()
             left = Application(left, right)
         return left
 
-    def parse_term(self, tokens):
-        if not tokens: raise ValueError("Unexpected end of input")
-        token = tokens.pop(0)
-        
+    def parse_term(self):
+        if self._pos >= len(self._tokens): raise ValueError("Unexpected end of input")
+        token = self._tokens[self._pos]
+        self._pos += 1
+
         if token == '(':
-            expr = self.parse_expression(tokens)
-            if not tokens or tokens.pop(0) != ')': raise ValueError("Missing closing parenthesis")
+            expr = self.parse_expression()
+            if self._pos >= len(self._tokens) or self._tokens[self._pos] != ')': raise ValueError("Missing closing parenthesis")
+            self._pos += 1
             return expr
         elif token == '\\' or token == 'λ':
             params = []
-            while tokens and tokens[0] != '.':
-                params.append(tokens.pop(0))
-            if tokens: tokens.pop(0) 
-            body = self.parse_expression(tokens)
+            while self._pos < len(self._tokens) and self._tokens[self._pos] != '.':
+                params.append(self._tokens[self._pos])
+                self._pos += 1
+            if self._pos < len(self._tokens): self._pos += 1
+            body = self.parse_expression()
             term = body
             for p in reversed(params):
                 term = Abstraction(p, term)
             return term
         else:
-            if token in self.macros:
-                return copy.deepcopy(self.macros[token])
-            return Variable(token)
+            entry = self.macros.get(token)
+            if entry is not None:
+                parsed = entry.parsed
+                if parsed is None:
+                    parsed = entry.parsed = self.parse(entry.source)
+                return parsed
+            if token.isdigit():
+                return Parser._church_numeral(int(token))
+            return Variable.intern(token)
+
+    @staticmethod
+    def _church_numeral(n):
+        term = Parser._NUMERALS.get(n)
+        if term is None:
+            body = Variable.intern('x')
+            f = Variable.intern('f')
+            for _ in range(n):
+                body = Application(f, body)
+            term = Abstraction('f', Abstraction('x', body))
+            Parser._NUMERALS[n] = term
+        return term
 
 class GraphNode:
     TYPE_APPLICATION = 0
     TYPE_COMBINATOR = 1
     TYPE_INDIRECTION = 2
     TYPE_VARIABLE = 3
-    
-    def __init__(self, node_type, left=None, right=None, value=None):
+
+    __slots__ = ('type', 'left', 'right', 'value', 'code')
+
+    def __init__(self, node_type, left=None, right=None, value=None, code=0):
         self.type = node_type
         self.left = left
         self.right = right
         self.value = value
+        self.code = code
 
 class GraphMachine:
+    _ARITY = {'I': 1, 'K': 2, 'S': 3, 'B': 3, 'C': 3, 'W': 2, 'M': 1, 'Y': 1}
+
+    _OPCODES = {'I': 1, 'K': 2, 'S': 3, 'B': 4, 'C': 5, 'W': 6, 'M': 7, 'Y': 8}
+    _OP_ARITY = (0, 1, 2, 3, 3, 3, 2, 1, 1)
+
     def __init__(self):
         self.steps = 0
         self.max_steps = 100000
+        self._arity_get = GraphMachine._ARITY.get
         
     def compile(self, term):
-        if isinstance(term, Application):
-            return GraphNode(GraphNode.TYPE_APPLICATION, self.compile(term.left), self.compile(term.right))
-        if isinstance(term, Variable):
-            return GraphNode(GraphNode.TYPE_COMBINATOR, value=term.name)
-        raise ValueError(f"Cannot compile {term} to graph")
+        nodes = {}
+        stack = [term]
+        while stack:
+            current = stack.pop()
+            if id(current) in nodes:
+                continue
+            if isinstance(current, Variable):
+                nodes[id(current)] = GraphNode(GraphNode.TYPE_COMBINATOR, value=current.name, code=GraphMachine._OPCODES.get(current.name, 0))
+            elif isinstance(current, Application):
+                left = nodes.get(id(current.left))
+                right = nodes.get(id(current.right))
+                if left is not None and right is not None:
+                    nodes[id(current)] = GraphNode(GraphNode.TYPE_APPLICATION, left, right)
+                else:
+                    stack.append(current)
+                    if right is None: stack.append(current.right)
+                    if left is None: stack.append(current.left)
+            else:
+                raise ValueError(f"Cannot compile {current} to graph")
+        return nodes[id(term)]
         
     def decompile(self, node):
-        while node.type == GraphNode.TYPE_INDIRECTION:
+        APP = GraphNode.TYPE_APPLICATION
+        IND = GraphNode.TYPE_INDIRECTION
+        COMB = GraphNode.TYPE_COMBINATOR
+        out = {}
+        todo = [node]
+        while todo:
+            current = todo[-1]
+            while current.type == IND:
+                current = current.left
+            key = id(current)
+            if key in out:
+                todo.pop()
+                continue
+            if current.type == APP:
+                left = current.left
+                while left.type == IND:
+                    left = left.left
+                right = current.right
+                while right.type == IND:
+                    right = right.left
+                left_term = out.get(id(left))
+                right_term = out.get(id(right))
+                if left_term is not None and right_term is not None:
+                    out[key] = Application(left_term, right_term)
+                    todo.pop()
+                else:
+                    if right_term is None: todo.append(right)
+                    if left_term is None: todo.append(left)
+            elif current.type == COMB:
+                out[key] = Variable.intern(current.value)
+                todo.pop()
+            else:
+                out[key] = Variable.intern("?")
+                todo.pop()
+        while node.type == IND:
             node = node.left
-        if node.type == GraphNode.TYPE_APPLICATION:
-            return Application(self.decompile(node.left), self.decompile(node.right))
-        if node.type == GraphNode.TYPE_COMBINATOR:
-            return Variable(node.value)
-        return Variable("?")
+        return out[id(node)]
 
     def reduce(self, root):
-        spine = []
-        current = root
-        
-        while True:
-            while current.type == GraphNode.TYPE_INDIRECTION:
-                current = current.left
-            if current.type == GraphNode.TYPE_APPLICATION:
-                spine.append(current)
-                current = current.left
-            else:
+        todo = [root]
+
+        while todo:
+            spine = []
+            current = todo.pop()
+
+            while True:
+                while current.type == GraphNode.TYPE_INDIRECTION:
+                    current = current.left
+                if current.type == GraphNode.TYPE_APPLICATION:
+                    spine.append(current)
+                    current = current.left
+                else:
+                    break
+
+            head = current
+            if head.type == GraphNode.TYPE_COMBINATOR:
+                name = head.value
+                arguments_needed = self._arity_get(name, 0)
+                if arguments_needed != 0 and len(spine) >= arguments_needed:
+                    args = [spine[-1 - i].right for i in range(arguments_needed)]
+                    root_app = spine[-arguments_needed]
+
+                    self.perform_reduction(name, root_app, args)
+                    return True
+
+            for node in spine:
+                todo.append(node.right)
+        return False
+
+    def run(self, root, limit=None):
+        if limit is None: limit = self.max_steps
+        APP = GraphNode.TYPE_APPLICATION
+        IND = GraphNode.TYPE_INDIRECTION
+        COMB = GraphNode.TYPE_COMBINATOR
+        op_arity = GraphMachine._OP_ARITY
+        steps = 0
+        pending = [root]
+
+        while pending:
+            spine = []
+            current = pending.pop()
+
+            while True:
+                while current.type == IND:
+                    target = current.left
+                    while target.type == IND:
+                        target = target.left
+                    current.left = target
+                    current = target
+
+                if current.type == APP:
+                    spine.append(current)
+                    current = current.left
+                    continue
+
+                if current.type == COMB:
+                    code = current.code
+                    arguments_needed = op_arity[code]
+                    if arguments_needed != 0 and len(spine) >= arguments_needed:
+                        if steps >= limit:
+                            return steps
+                        redex = spine[-arguments_needed]
+
+                        if code == 1 or code == 2:
+                            redex.type = IND
+                            redex.left = spine[-1].right
+                        elif code == 3:
+                            x = redex.right
+                            redex.type = APP
+                            redex.left = GraphNode(APP, spine[-1].right, x)
+                            redex.right = GraphNode(APP, spine[-2].right, x)
+                        elif code == 4:
+                            n1 = GraphNode(APP, spine[-2].right, redex.right)
+                            redex.left = spine[-1].right
+                            redex.right = n1
+                        elif code == 5:
+                            n1 = GraphNode(APP, spine[-1].right, redex.right)
+                            redex.right = spine[-2].right
+                            redex.left = n1
+                        elif code == 6:
+                            x = redex.right
+                            redex.left = GraphNode(APP, spine[-1].right, x)
+                            redex.right = x
+
+                        steps += 1
+                        del spine[-arguments_needed:]
+                        current = redex
+                        continue
+
+                for node in spine:
+                    pending.append(node.right)
                 break
-                
-        head = current
-        if head.type != GraphNode.TYPE_COMBINATOR:
-            return False
-            
-        name = head.value
-        arguments_needed = self.get_arity(name)
-        if arguments_needed == 0 or len(spine) < arguments_needed:
-            return False
-            
-        args = [node.right for node in spine[-arguments_needed:][::-1]]
-        root_app = spine[-arguments_needed]
-        
-        self.perform_reduction(name, root_app, args)
-        return True
+        return steps
 
     def get_arity(self, name):
-        table = {'I': 1, 'K': 2, 'S': 3, 'B': 3, 'C': 3, 'W': 2, 'M': 1, 'Y': 1}
-        return table.get(name, 0)
+        return self._arity_get(name, 0)
         
     def perform_reduction(self, name, root, args):
-        if name == 'I':
-            root.type = GraphNode.TYPE_INDIRECTION
-            root.left = args[0]
-        elif name == 'K':
-            root.type = GraphNode.TYPE_INDIRECTION
-            root.left = args[0]
-        elif name == 'S':
-            n1 = GraphNode(GraphNode.TYPE_APPLICATION, args[0], args[2])
-            n2 = GraphNode(GraphNode.TYPE_APPLICATION, args[1], args[2])
-            root.type = GraphNode.TYPE_APPLICATION
-            root.left = n1
-            root.right = n2
-        elif name == 'B':
-            n1 = GraphNode(GraphNode.TYPE_APPLICATION, args[1], args[2])
-            root.type = GraphNode.TYPE_APPLICATION
-            root.left = args[0]
-            root.right = n1
-        elif name == 'C':
-            n1 = GraphNode(GraphNode.TYPE_APPLICATION, args[0], args[2])
-            root.type = GraphNode.TYPE_APPLICATION
-            root.left = n1
-            root.right = args[1]
-        elif name == 'W':
-            n1 = GraphNode(GraphNode.TYPE_APPLICATION, args[0], args[1])
-            root.type = GraphNode.TYPE_APPLICATION
-            root.left = n1
-            root.right = args[1]
+        handler = GraphMachine._RULES.get(name)
+        if handler is not None:
+            handler(self, root, args)
+
+    def _apply_I(self, root, args):
+        root.type = GraphNode.TYPE_INDIRECTION
+        root.left = args[0]
+
+    def _apply_K(self, root, args):
+        root.type = GraphNode.TYPE_INDIRECTION
+        root.left = args[0]
+
+    def _apply_S(self, root, args):
+        n1 = GraphNode(GraphNode.TYPE_APPLICATION, args[0], args[2])
+        n2 = GraphNode(GraphNode.TYPE_APPLICATION, args[1], args[2])
+        root.type = GraphNode.TYPE_APPLICATION
+        root.left = n1
+        root.right = n2
+
+    def _apply_B(self, root, args):
+        n1 = GraphNode(GraphNode.TYPE_APPLICATION, args[1], args[2])
+        root.type = GraphNode.TYPE_APPLICATION
+        root.left = args[0]
+        root.right = n1
+
+    def _apply_C(self, root, args):
+        n1 = GraphNode(GraphNode.TYPE_APPLICATION, args[0], args[2])
+        root.type = GraphNode.TYPE_APPLICATION
+        root.left = n1
+        root.right = args[1]
+
+    def _apply_W(self, root, args):
+        n1 = GraphNode(GraphNode.TYPE_APPLICATION, args[0], args[1])
+        root.type = GraphNode.TYPE_APPLICATION
+        root.left = n1
+        root.right = args[1]
+
+    _RULES = {'I': _apply_I, 'K': _apply_K, 'S': _apply_S, 'B': _apply_B, 'C': _apply_C, 'W': _apply_W}
 
 class ThemeDatabase:
     THEMES = {
@@ -876,85 +1206,73 @@ F1 / 'help': Toggle Help Mode
     }
 
 class HelpSystem:
+    _SORTED_KEYS = sorted(TutorialData.CHAPTERS.keys())
+
     @staticmethod
     def get_chapter(index):
-        keys = sorted(TutorialData.CHAPTERS.keys())
+        keys = HelpSystem._SORTED_KEYS
         if 0 <= index < len(keys):
             return TutorialData.CHAPTERS[keys[index]]
         return "End of Tutorial."
 
+    _SEARCH_INDEX = None
+
     @staticmethod
     def search_encyclopedia(query):
 
+        query = query.lower()
+        index = HelpSystem._SEARCH_INDEX
+        if index is None:
+            index = HelpSystem._SEARCH_INDEX = (
+                [(key, text.lower()) for key, text in TutorialData.CHAPTERS.items()],
+                [(key, key.lower()) for key in ThemeDatabase.THEMES],
+                [(key, key.lower(), text.lower()) for key, text in Encyclopedia.ENTRIES.items()],
+            )
+        chapters, themes, entries = index
         results = []
-        for key, text in TutorialData.CHAPTERS.items():
-            if query.lower() in text.lower():
+        for key, lower_text in chapters:
+            if query in lower_text:
                 results.append(key)
-        for key in ThemeDatabase.THEMES:
-            if query.lower() in key.lower():
+        for key, lower_key in themes:
+            if query in lower_key:
                 results.append(key)
-        for key, text in Encyclopedia.ENTRIES.items():
-            if query.lower() in key.lower() or query.lower() in text.lower():
+        for key, lower_key, lower_text in entries:
+            if query in lower_key or query in lower_text:
                 results.append(key)
         return results
 
+def _factorial(n):
+    return math.factorial(n)
+
+def _fibonacci(n):
+    if n <= 1: return n
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+@functools.lru_cache(maxsize=None)
+def _ackermann(m, n):
+    if m == 0: return n + 1
+    if m > 0 and n == 0: return _ackermann(m-1, 1)
+    if m > 0 and n > 0: return _ackermann(m-1, _ackermann(m, n-1))
+    return 0
+
 class AdvancedMath:
-    @staticmethod
-    def factorial(n):
-        if n == 0: return 1
-        return n * AdvancedMath.factorial(n-1)
-    
-    @staticmethod
-    def fibonacci(n):
-        if n <= 1: return n
-        return AdvancedMath.fibonacci(n-1) + AdvancedMath.fibonacci(n-2)
-    
-    @staticmethod
-    def ackermann(m, n):
-        if m == 0: return n + 1
-        if m > 0 and n == 0: return AdvancedMath.ackermann(m-1, 1)
-        if m > 0 and n > 0: return AdvancedMath.ackermann(m-1, AdvancedMath.ackermann(m, n-1))
-        return 0
+    factorial = staticmethod(_factorial)
+    fibonacci = staticmethod(_fibonacci)
+    ackermann = staticmethod(_ackermann)
 
 class Utils:
     @staticmethod
+    @functools.lru_cache(maxsize=64)
     def wrap_text(text, width):
-        lines = []
-        words = text.split()
-        current_line = []
-        current_len = 0
-        for word in words:
-            if current_len + len(word) + 1 > width:
-                lines.append(' '.join(current_line))
-                current_line = [word]
-                current_len = len(word)
-            else:
-                current_line.append(word)
-                current_len += len(word) + 1
-        if current_line: lines.append(' '.join(current_line))
-        return lines
-
-    @staticmethod
-    def wrap_text(text, width):
-        
-        paragraphs = text.split('\n')
         wrapped_lines = []
-        for p in paragraphs:
+        for p in text.split('\n'):
             if not p:
                 wrapped_lines.append("")
                 continue
-            words = p.split()
-            current_line = []
-            current_len = 0
-            for word in words:
-                if current_len + len(word) + 1 > width:
-                    wrapped_lines.append(' '.join(current_line))
-                    current_line = [word]
-                    current_len = len(word)
-                else:
-                    current_line.append(word)
-                    current_len += len(word) + 1
-            if current_line: wrapped_lines.append(' '.join(current_line))
+            wrapped_lines.extend(textwrap.wrap(p, max(width, 1)) or [""])
         return wrapped_lines
 
     @staticmethod
@@ -966,69 +1284,211 @@ class Utils:
 class EncryptionUtils:
     @staticmethod
     def simple_hash(text):
-        h = 5381
-        for c in text:
-            h = ((h << 5) + h) + ord(c)
-        return h & 0xFFFFFFFF
+        return zlib.crc32(text.encode('utf-8')) & 0xFFFFFFFF
 
 class Compiler:
     ALGORITHMS = ['primitive', 'eta', 'turner', 'rosenbloom']
-    
+
+    _ABSTRACT_CACHE = {}
+    _COMPILE_CACHE = {}
+    _OPTIMIZE_CACHE = {}
+
     @staticmethod
     def free_variables(term):
-        if isinstance(term, Variable): return {term.name}
-        if isinstance(term, Application): return Compiler.free_variables(term.left) | Compiler.free_variables(term.right)
-        if isinstance(term, Abstraction): return Compiler.free_variables(term.body) - {term.parameter}
-        return set()
+        if term._fv is not None: return term._fv
+
+        order = []
+        stack = [term]
+        while stack:
+            node = stack.pop()
+            if node._fv is not None: continue
+            order.append(node)
+            if isinstance(node, Application):
+                if node.right._fv is None: stack.append(node.right)
+                if node.left._fv is None: stack.append(node.left)
+            elif isinstance(node, Abstraction):
+                if node.body._fv is None: stack.append(node.body)
+
+        for node in reversed(order):
+            if node._fv is not None: continue
+            if isinstance(node, Variable): node._fv = frozenset((node.name,))
+            elif isinstance(node, Application): node._fv = node.left._fv | node.right._fv
+            elif isinstance(node, Abstraction): node._fv = node.body._fv - {node.parameter}
+            else: node._fv = frozenset()
+        return term._fv
 
     @staticmethod
     def abstract(x, term, algorithm='turner'):
-        if algorithm == 'primitive': return Compiler.abstract_primitive(x, term)
-        if algorithm == 'eta': return Compiler.abstract_eta(x, term)
-        if algorithm == 'turner': return Compiler.abstract_turner(x, term)
-        return Compiler.abstract_turner(x, term)
+        key = (algorithm, x, term)
+        cached = Compiler._ABSTRACT_CACHE.get(key)
+        if cached is not None: return cached
+        if algorithm == 'primitive': result = Compiler.abstract_primitive(x, term)
+        elif algorithm == 'eta': result = Compiler.abstract_eta(x, term)
+        else: result = Compiler.abstract_turner(x, term)
+        Compiler._ABSTRACT_CACHE[key] = result
+        return result
 
     @staticmethod
     def abstract_primitive(x, term):
         if isinstance(term, Application):
-            return Application(Application(Variable('S'), Compiler.abstract_primitive(x, term.left)), Compiler.abstract_primitive(x, term.right))
+            return Application(Application(Variable.intern('S'), Compiler.abstract_primitive(x, term.left)), Compiler.abstract_primitive(x, term.right))
         if isinstance(term, Variable) and term.name == x:
-            return Variable('I')
-        return Application(Variable('K'), term)
+            return Variable.intern('I')
+        return Application(Variable.intern('K'), term)
 
     @staticmethod
     def abstract_eta(x, term):
-        if term == Variable(x): return Variable('I')
-        if x not in Compiler.free_variables(term): return Application(Variable('K'), term)
-        if isinstance(term, Application):
-            if isinstance(term.right, Variable) and term.right.name == x and x not in Compiler.free_variables(term.left):
-                return term.left
-            return Application(Application(Variable('S'), Compiler.abstract_eta(x, term.left)), Compiler.abstract_eta(x, term.right))
-        raise ValueError(f"Abstraction validation error for {x} in {term}")
+        S = Variable.intern('S')
+        K = Variable.intern('K')
+        done = {}
+        stack = [term]
+        while stack:
+            current = stack[-1]
+            key = id(current)
+            if key in done:
+                stack.pop()
+                continue
+            if isinstance(current, Variable) and current.name == x:
+                done[key] = Variable.intern('I')
+                stack.pop()
+            elif x not in Compiler.free_variables(current):
+                done[key] = Application(K, current)
+                stack.pop()
+            elif isinstance(current, Application):
+                fvm = Compiler.free_variables(current.left)
+                if isinstance(current.right, Variable) and current.right.name == x and x not in fvm:
+                    done[key] = current.left
+                    stack.pop()
+                    continue
+                m_abs = done.get(id(current.left))
+                n_abs = done.get(id(current.right))
+                if m_abs is None or n_abs is None:
+                    if n_abs is None: stack.append(current.right)
+                    if m_abs is None: stack.append(current.left)
+                    continue
+                done[key] = Application(Application(S, m_abs), n_abs)
+                stack.pop()
+            else:
+                raise ValueError(f"Abstraction validation error for {x} in {current}")
+        return done[id(term)]
 
     @staticmethod
     def abstract_turner(x, term):
-        if term == Variable(x): return Variable('I')
-        if x not in Compiler.free_variables(term): return Application(Variable('K'), term)
-        if isinstance(term, Application):
-            m = term.left
-            n = term.right
-            if n == Variable(x) and x not in Compiler.free_variables(m): return m
-            m_abs = Compiler.abstract_turner(x, m)
-            n_abs = Compiler.abstract_turner(x, n)
-            if x not in Compiler.free_variables(m): return Application(Application(Variable('B'), m), n_abs)
-            if x not in Compiler.free_variables(n): return Application(Application(Variable('C'), m_abs), n)
-            return Application(Application(Variable('S'), m_abs), n_abs)
-        raise ValueError("Turner abstraction failed unexpectedly")
+        S = Variable.intern('S')
+        K = Variable.intern('K')
+        B = Variable.intern('B')
+        C = Variable.intern('C')
+        done = {}
+        stack = [term]
+        while stack:
+            current = stack[-1]
+            key = id(current)
+            if key in done:
+                stack.pop()
+                continue
+            if isinstance(current, Variable) and current.name == x:
+                done[key] = Variable.intern('I')
+                stack.pop()
+            elif x not in Compiler.free_variables(current):
+                done[key] = Application(K, current)
+                stack.pop()
+            elif isinstance(current, Application):
+                m = current.left
+                n = current.right
+                fvm = Compiler.free_variables(m)
+                if isinstance(n, Variable) and n.name == x and x not in fvm:
+                    done[key] = m
+                    stack.pop()
+                elif x not in fvm:
+                    n_abs = done.get(id(n))
+                    if n_abs is None:
+                        stack.append(n)
+                        continue
+                    done[key] = Application(Application(B, m), n_abs)
+                    stack.pop()
+                elif x not in Compiler.free_variables(n):
+                    m_abs = done.get(id(m))
+                    if m_abs is None:
+                        stack.append(m)
+                        continue
+                    done[key] = Application(Application(C, m_abs), n)
+                    stack.pop()
+                else:
+                    m_abs = done.get(id(m))
+                    n_abs = done.get(id(n))
+                    if m_abs is None or n_abs is None:
+                        if n_abs is None: stack.append(n)
+                        if m_abs is None: stack.append(m)
+                        continue
+                    done[key] = Application(Application(S, m_abs), n_abs)
+                    stack.pop()
+            else:
+                raise ValueError("Turner abstraction failed unexpectedly")
+        return done[id(term)]
 
     @staticmethod
     def compile(term, algorithm='turner'):
-        if isinstance(term, Abstraction):
-            body_compiled = Compiler.compile(term.body, algorithm)
-            return Compiler.abstract(term.parameter, body_compiled, algorithm)
-        if isinstance(term, Application):
-            return Application(Compiler.compile(term.left, algorithm), Compiler.compile(term.right, algorithm))
-        return term
+        cache = Compiler._COMPILE_CACHE
+        result = cache.get((algorithm, term))
+        if result is not None: return result
+
+        stack = [term]
+        while stack:
+            current = stack[-1]
+            key = (algorithm, current)
+            if key in cache:
+                stack.pop()
+                continue
+            if isinstance(current, Abstraction):
+                body = cache.get((algorithm, current.body))
+                if body is None:
+                    stack.append(current.body)
+                    continue
+                cache[key] = Compiler.abstract(current.parameter, body, algorithm)
+                stack.pop()
+            elif isinstance(current, Application):
+                left = cache.get((algorithm, current.left))
+                right = cache.get((algorithm, current.right))
+                if left is None or right is None:
+                    if right is None: stack.append(current.right)
+                    if left is None: stack.append(current.left)
+                    continue
+                if left is current.left and right is current.right:
+                    cache[key] = current
+                else:
+                    cache[key] = Application(left, right)
+                stack.pop()
+            else:
+                cache[key] = current
+                stack.pop()
+        return cache[(algorithm, term)]
+
+    @staticmethod
+    def optimize(term):
+        if not isinstance(term, Application):
+            return term
+        cached = Compiler._OPTIMIZE_CACHE.get(term)
+        if cached is not None: return cached
+        result = Compiler._peephole(Compiler.optimize(term.left), Compiler.optimize(term.right))
+        Compiler._OPTIMIZE_CACHE[term] = result
+        return result
+
+    @staticmethod
+    def _peephole(left, right):
+        if isinstance(left, Application) and isinstance(left.left, Variable) and left.left.name == 'S':
+            m = left.right
+            n = right
+            m_const = isinstance(m, Application) and isinstance(m.left, Variable) and m.left.name == 'K'
+            n_const = isinstance(n, Application) and isinstance(n.left, Variable) and n.left.name == 'K'
+            if m_const and n_const:
+                return Application(Variable.intern('K'), Compiler._peephole(m.right, n.right))
+            if m_const and isinstance(n, Variable) and n.name == 'I':
+                return m.right
+            if m_const:
+                return Application(Application(Variable.intern('B'), m.right), n)
+            if n_const:
+                return Application(Application(Variable.intern('C'), m), n.right)
+        return Application(left, right)
 
 class StandardLibrary:
     DEFINITIONS = {
@@ -1066,6 +1526,18 @@ class StandardLibrary:
         "VOID": "(\\x. x)"
     }
 
+class Macro:
+    """One named definition: source text plus lazily built parsed and
+    compiled forms. The parser and the app share a single dict of these,
+    so resolving a macro costs one dict lookup plus a slot read.
+    """
+    __slots__ = ('source', 'parsed', 'compiled')
+
+    def __init__(self, source, parsed=None, compiled=None):
+        self.source = source
+        self.parsed = parsed
+        self.compiled = compiled
+
 class Encyclopedia:
     ENTRIES = {
         'S': "The Starling combinator. S x y z = x z (y z). It distributes the argument z to both x and y, then applies the results. It is the basis of SKI combinator calculus along with K.",
@@ -1091,15 +1563,16 @@ class CombinatorApp:
         width, height = shutil.get_terminal_size()
         self.buffer = ScreenBuffer(width, height)
         self.input_system = InputSystem()
-        self.macro_db = {}
+        self.macros = {}
         self.parser = Parser()
         self.compiler = Compiler()
         self.type_engine = TypeInferenceEngine()
         self.graph_machine = GraphMachine()
+        self.nf_cache = {}
         
-        self.history = []
+        self.history = collections.deque(maxlen=1000)
         self.history_index = 0
-        self.current_mode = "REPL" 
+        self.current_mode = "REPL"
         
   
         self._load_std_lib()
@@ -1122,6 +1595,61 @@ class CombinatorApp:
         
         self.repl_input.focused = True
 
+        self._global_keys = {
+            'CTRL_C': self._on_quit_key,
+            'F2': self._on_save_config,
+            'F3': self._on_load_config,
+        }
+        self._repl_keys = {
+            'UP': self._on_history_up,
+            'DOWN': self._on_history_down,
+            'ENTER': self._on_repl_enter,
+            'F1': self._toggle_help,
+        }
+        self._help_keys = {
+            'F1': self._toggle_help,
+            'ESCAPE': self._toggle_help,
+        }
+
+    def _on_history_up(self):
+        if self.history_index > 0:
+            self.history_index -= 1
+            if self.history_index < len(self.history):
+                self.repl_input.text = self.history[self.history_index]
+                self.repl_input.cursor_pos = len(self.repl_input.text)
+
+    def _on_history_down(self):
+        if self.history_index < len(self.history):
+            self.history_index += 1
+            if self.history_index < len(self.history):
+                self.repl_input.text = self.history[self.history_index]
+                self.repl_input.cursor_pos = len(self.repl_input.text)
+            else:
+                self.repl_input.text = ""
+                self.repl_input.cursor_pos = 0
+
+    def _on_repl_enter(self):
+        cmd = self.repl_input.text
+        if cmd:
+            self.history.append(cmd)
+            self.history_index = len(self.history)
+        self.process_command(cmd)
+        self.repl_input.text = ""
+        self.repl_input.cursor_pos = 0
+
+    def _on_quit_key(self):
+        self.running = False
+
+    def _on_save_config(self):
+        self.status_bar.update_status(self.current_mode, "Saving Config...", self.status_bar.memory)
+        ConfigurationManager.save_configuration_to_file("config.json", ConfigurationManager.DEFAULT_CONFIG)
+        time.sleep(0.5)
+
+    def _on_load_config(self):
+        self.status_bar.update_status(self.current_mode, "Loading Config...", self.status_bar.memory)
+        ConfigurationManager.load_configuration_from_file("config.json")
+        time.sleep(0.5)
+
     def check_resize(self):
         w, h = shutil.get_terminal_size()
         if w != self.buffer.width or h != self.buffer.height:
@@ -1153,12 +1681,39 @@ class CombinatorApp:
             self.repl_input.focused = True
             self.buffer.force_redraw = True 
 
+    _CACHE_DIR = os.path.expanduser('~/.combinatorx')
+
     def _load_std_lib(self):
-        for name, code in StandardLibrary.DEFINITIONS.items():
-            parsed = self.parser.parse(code)
-            self.parser.macros[name] = parsed 
-            compiled = self.compiler.compile(parsed)
-            self.macro_db[name] = compiled 
+        self.macros = {name: Macro(code)
+                       for name, code in StandardLibrary.DEFINITIONS.items()}
+        self.parser.macros = self.macros
+        try:
+            with open(self._stdlib_cache_path(), 'rb') as f:
+                snapshot = pickle.load(f)
+            for name, (parsed, compiled) in snapshot.items():
+                entry = self.macros.get(name)
+                if entry is not None:
+                    entry.parsed = parsed
+                    entry.compiled = compiled
+        except (OSError, pickle.PickleError, EOFError, ValueError):
+            pass
+
+    def _stdlib_cache_path(self):
+        key = hashlib.sha1(repr(StandardLibrary.DEFINITIONS).encode()).hexdigest()
+        return os.path.join(self._CACHE_DIR, f'stdlib-{key}.pkl')
+
+    def _save_std_lib_cache(self):
+        snapshot = {name: (entry.parsed, entry.compiled)
+                    for name, entry in self.macros.items()
+                    if entry.parsed is not None and name in StandardLibrary.DEFINITIONS}
+        if not snapshot:
+            return
+        try:
+            os.makedirs(self._CACHE_DIR, exist_ok=True)
+            with open(self._stdlib_cache_path(), 'wb') as f:
+                pickle.dump(snapshot, f, pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
 
     def intro_animation(self):
         title = " COMBINATOR X "
@@ -1168,32 +1723,50 @@ class CombinatorApp:
         cx, cy = w // 2, h // 2
         
         
-        drops = [{'x': random.randint(0, w-1), 'y': random.randint(-h, 0), 'speed': random.uniform(0.5, 1.5), 'char': random.choice(list(Constants.SYMBOLS.values()))} for _ in range(50)]
-        
+        # Structure-of-arrays: parallel lists instead of a list of dicts,
+        # so the per-frame loop does index reads rather than dict lookups.
+        count = 50
+        symbols = list(Constants.SYMBOLS.values())
+        drop_x = [random.randint(0, w-1) for _ in range(count)]
+        drop_y = [random.randint(-h, 0) for _ in range(count)]
+        drop_speed = [random.uniform(0.5, 1.5) for _ in range(count)]
+        drop_char = [random.choice(symbols) for _ in range(count)]
+
+        # The palette cannot change mid-intro, so hoist every style lookup
+        # out of the frame loop.
+        palette = Constants.CURRENT_PALETTE
+        bg = palette['background']
+        fg = palette['foreground']
+        rain_color = palette['accent_secondary']
+        box_style = palette['accent_primary']
+        title_style = palette['accent_tertiary'] + palette['bold']
+        put_char = self.buffer.put_char
+        rand = random.random
+
         frames = 60
         for f in range(frames):
-            self.buffer.fill_rect(0, 0, w, h, ' ', Constants.CURRENT_PALETTE['background'])
-            
-            
-            for drop in drops:
-                drop['y'] += drop['speed']
-                if drop['y'] > h:
-                    drop['y'] = random.randint(-10, 0)
-                    drop['x'] = random.randint(0, w-1)
-                
-                dy = int(drop['y'])
+            self.buffer.fill_rect(0, 0, w, h, ' ', bg)
+
+
+            for i in range(count):
+                y = drop_y[i] + drop_speed[i]
+                if y > h:
+                    y = random.randint(-10, 0)
+                    drop_x[i] = random.randint(0, w-1)
+                drop_y[i] = y
+
+                dy = int(y)
                 if 0 <= dy < h:
-                     color = Constants.CURRENT_PALETTE['accent_secondary'] if random.random() > 0.1 else Constants.CURRENT_PALETTE['foreground']
-                     self.buffer.put_char(drop['x'], dy, drop['char'], color)
+                     put_char(drop_x[i], dy, drop_char[i], rain_color if rand() > 0.1 else fg)
+
 
-            
             if f > 10:
                 opacity = min(1.0, (f - 10) / 30.0)
                 if opacity > 0.5:
-                     self.buffer.draw_box(cx - 15, cy - 2, 30, 5, Constants.CURRENT_PALETTE['accent_primary'], double=True)
-                     self.buffer.put_string(cx - len(title)//2, cy, title, Constants.CURRENT_PALETTE['accent_tertiary'] + Constants.CURRENT_PALETTE['bold'])
+                     self.buffer.draw_box(cx - 15, cy - 2, 30, 5, box_style, double=True)
+                     self.buffer.put_string(cx - len(title)//2, cy, title, title_style)
                 if opacity > 0.8:
-                     self.buffer.put_string(cx - len(subtitle)//2, cy + 1, subtitle, Constants.CURRENT_PALETTE['foreground'])
+                     self.buffer.put_string(cx - len(subtitle)//2, cy + 1, subtitle, fg)
 
             self.buffer.render()
             time.sleep(0.05)
@@ -1202,11 +1775,13 @@ class CombinatorApp:
 
     def run(self):
         print(Constants.CURRENT_PALETTE['background'])
-        os.system('clear')
+        sys.stdout.write(Constants.CLEAR)
+        sys.stdout.flush()
         self.intro_animation()
         self.input_system.start()
         
         try:
+            last_tick = time.monotonic()
             while self.running:
 
                 while self.input_system.keys:
@@ -1217,43 +1792,23 @@ class CombinatorApp:
                     self._handle_global_keys(key)
                     
                     if self.current_mode == "REPL":
-                        if key == 'UP':
-                            if self.history_index > 0:
-                                self.history_index -= 1
-                                if self.history_index < len(self.history):
-                                    self.repl_input.text = self.history[self.history_index]
-                                    self.repl_input.cursor_pos = len(self.repl_input.text)
-                        elif key == 'DOWN':
-                            if self.history_index < len(self.history):
-                                self.history_index += 1
-                                if self.history_index < len(self.history):
-                                    self.repl_input.text = self.history[self.history_index]
-                                    self.repl_input.cursor_pos = len(self.repl_input.text)
-                                else:
-                                    self.repl_input.text = ""
-                                    self.repl_input.cursor_pos = 0
+                        handler = self._repl_keys.get(key)
+                        if handler:
+                            handler()
                         else:
                             self.repl_input.on_key(key)
 
-                        if key == 'ENTER':
-                            cmd = self.repl_input.text
-                            if cmd:
-                                self.history.append(cmd)
-                                self.history_index = len(self.history)
-                            self.process_command(cmd)
-                            self.repl_input.text = ""
-                            self.repl_input.cursor_pos = 0
-                        elif key == 'F1':
-                            self._toggle_help()
-                            
                     elif self.current_mode == "HELP":
-                        if key == 'F1' or key == 'ESCAPE':
-                            self._toggle_help()
+                        handler = self._help_keys.get(key)
+                        if handler:
+                            handler()
                         else:
                             self.help_view.on_key(key)
 
                 
-                dt = Constants.TICK_RATE
+                now = time.monotonic()
+                dt = now - last_tick
+                last_tick = now
                 self.check_resize()
                 self.repl_input.update(dt)
                 
@@ -1261,37 +1816,38 @@ class CombinatorApp:
                 self.status_bar.update_status(self.current_mode, "Running", mem)
                 
                 
-                self.buffer.fill_rect(0, 0, self.buffer.width, self.buffer.height, ' ', Constants.CURRENT_PALETTE['background'])
+                # Re-read per frame: the 'theme' command can swap the palette.
+                background = Constants.CURRENT_PALETTE['background']
+                self.buffer.fill_rect(0, 0, self.buffer.width, self.buffer.height, ' ', background)
                 self.root_window.draw(self.buffer)
-                
-                        
+
+
                 if self.help_view.visible:
-                    
-                    self.buffer.fill_rect(self.help_view.x, self.help_view.y, self.help_view.width, self.help_view.height, ' ', Constants.CURRENT_PALETTE['background'])
+
+                    self.buffer.fill_rect(self.help_view.x, self.help_view.y, self.help_view.width, self.help_view.height, ' ', background)
                     self.help_view.draw(self.buffer)
                     
                 self.buffer.render()
-                
-                time.sleep(dt)
+
+                # Wake immediately on a keypress; otherwise idle until the
+                # next cursor-blink tick instead of spinning at TICK_RATE.
+                key_event = self.input_system.key_event
+                key_event.clear()
+                if not self.input_system.keys:
+                    key_event.wait(Constants.CURSOR_BLINK_RATE)
         except KeyboardInterrupt:
             pass
         finally:
             self.input_system.stop()
+            self._save_std_lib_cache()
             print(Constants.CURRENT_PALETTE['reset'])
-            os.system('clear')
+            sys.stdout.write(Constants.CLEAR)
+            sys.stdout.flush()
 
     def _handle_global_keys(self, key):
-        if key == 'CTRL_C':
-            self.running = False
-        elif key == 'F2':
-             self.status_bar.update_status(self.current_mode, "Saving Config...", self.status_bar.memory)
-             ConfigurationManager.save_configuration_to_file("config.json", ConfigurationManager.DEFAULT_CONFIG)
-             time.sleep(0.5) 
-        elif key == 'F3':
-             self.status_bar.update_status(self.current_mode, "Loading Config...", self.status_bar.memory)
-             ConfigurationManager.load_configuration_from_file("config.json")
-             time.sleep(0.5)
-            
+        handler = self._global_keys.get(key)
+        if handler: handler()
+
     def process_command(self, cmd):
         cmd = cmd.strip()
         if not cmd: return
@@ -1339,8 +1895,8 @@ class CombinatorApp:
                     name, body_str = args.split('=', 1)
                     name = name.strip()
                     parsed = self.parser.parse(body_str)
-                    self.parser.macros[name] = parsed
-                    self.macro_db[name] = self.compiler.compile(parsed)
+                    compiled = self.compiler.optimize(self.compiler.compile(parsed))
+                    self.macros[name] = Macro(body_str, parsed, compiled)
                     self.output_label.text = f"Defined {name}"
                     
             elif action == "type":
@@ -1350,11 +1906,12 @@ class CombinatorApp:
                 
             elif action == "reduce":
                 term = self.parser.parse(args)
-                compiled = self.compiler.compile(term)
+                compiled = self.compiler.optimize(self.compiler.compile(term))
                 graph = self.graph_machine.compile(compiled)
-                steps = 0
-                while self.graph_machine.reduce(graph) and steps < 1000:
-                    steps += 1
+                reduce_step = self.graph_machine.reduce
+                for _ in itertools.repeat(None, 1000):
+                    if not reduce_step(graph):
+                        break
                 res = self.graph_machine.decompile(graph)
                 self.output_label.text = f"Result: {res}"
             
@@ -1384,20 +1941,21 @@ class CombinatorApp:
                 self.output_label.text = f"Macros: {macros_list}"
 
             elif action == "matrix":
-                os.system('clear')
+                sys.stdout.write(Constants.CLEAR)
+                sys.stdout.flush()
                 EasterEggs.print_matrix()
                 time.sleep(2)
             
             else:
          
                 term = self.parser.parse(cmd)
-                compiled = self.compiler.compile(term)
-                graph = self.graph_machine.compile(compiled)
-                self.graph_machine.reduce(graph)
-            
-                for _ in range(5000):
-                    if not self.graph_machine.reduce(graph): break
-                res = self.graph_machine.decompile(graph)
+                compiled = self.compiler.optimize(self.compiler.compile(term))
+                res = self.nf_cache.get(compiled)
+                if res is None:
+                    graph = self.graph_machine.compile(compiled)
+                    self.graph_machine.run(graph, 5000)
+                    res = self.graph_machine.decompile(graph)
+                    self.nf_cache[compiled] = res
                 self.output_label.text = f"= {res}"
                 
         except Exception as e:
@@ -1434,6 +1992,8 @@ class Localization:
 
 
 class SystemDiagnostics:
+    _SCAN_MSGS = [f"Scanning sector {i}... Clean." for i in range(100)]
+
     def __init__(self):
         self.log_buffer = []
 
@@ -1456,8 +2016,7 @@ class SystemDiagnostics:
         self.check_memory()
         self.check_integrity()
    
-        for i in range(100):
-            self.log_buffer.append(f"Scanning sector {i}... Clean.")
+        self.log_buffer.extend(SystemDiagnostics._SCAN_MSGS)
         self.log_buffer.append("Scan Complete. No anomalies found.")
         return True
 
@@ -1497,29 +2056,48 @@ class DeprecatedAPIs:
 
     @staticmethod
     def legacy_calculate_factorial_recursive(n):
-        if n == 0: return 1
-        return n * DeprecatedAPIs.legacy_calculate_factorial_recursive(n - 1)
+        return math.factorial(n)
 
     @staticmethod
     def legacy_calculate_fibonacci_sequence_iterative(n):
+        # Fast doubling: F(2k) = F(k)*(2F(k+1)-F(k)),
+        # F(2k+1) = F(k)^2 + F(k+1)^2 — O(log n) steps instead of n.
+        if n <= 0:
+            return 0
         a, b = 0, 1
-        for _ in range(n):
-            a, b = b, a + b
+        for bit in bin(n)[2:]:
+            c = a * (2 * b - a)
+            d = a * a + b * b
+            if bit == '1':
+                a, b = d, c + d
+            else:
+                a, b = c, d
         return a
 
 class DebuggerUtils:
+    # Maps any byte into printable ASCII 33..126 for bytes.translate.
+    _ENTROPY_TABLE = bytes(33 + (b % 94) for b in range(256))
+
     @staticmethod
     def dump_memory_snapshot_to_console():
-        print("Dumping memory snapshot...")
+        raw = os.urandom(400)
+        lines = ["Dumping memory snapshot..."]
         for i in range(100):
-            print(f"Address 0x{i:08X}: {random.randint(0, 255):02X} {random.randint(0, 255):02X} {random.randint(0, 255):02X} {random.randint(0, 255):02X}")
-        print("Dump complete.")
+            chunk = raw[i * 4:i * 4 + 4]
+            lines.append(f"Address 0x{i:08X}: {chunk[0]:02X} {chunk[1]:02X} {chunk[2]:02X} {chunk[3]:02X}")
+        lines.append("Dump complete.")
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _probe_platform():
+        # platform.version() can shell out to uname; the answers never
+        # change within a process, so probe once.
+        return platform.machine(), platform.system(), platform.version()
 
     @staticmethod
     def verify_system_architecture_compatibility():
-        arch = platform.machine()
-        system = platform.system()
-        version = platform.version()
+        arch, system, version = DebuggerUtils._probe_platform()
         print(f"Architecture: {arch}")
         print(f"System: {system}")
         print(f"Version: {version}")
@@ -1527,10 +2105,8 @@ class DebuggerUtils:
 
     @staticmethod
     def generate_random_entropy_for_crypto_operations(length=1024):
-        entropy = ""
-        for i in range(length):
-            entropy += chr(random.randint(33, 126))
-        return entropy
+        raw = os.urandom(length)
+        return raw.translate(DebuggerUtils._ENTROPY_TABLE).decode('ascii')
 
 class ConfigurationManager:
     DEFAULT_CONFIG = {
@@ -1557,15 +2133,53 @@ class ConfigurationManager:
             'load': 'F3'
         }
     }
-    
+    # Read-only view handed out by load/reset so callers share one object
+    # instead of each getting a mutable reference to the defaults.
+    DEFAULT_CONFIG = types.MappingProxyType(DEFAULT_CONFIG)
+
+
+    # Parsed configs keyed by (filename, mtime): repeat loads of an
+    # unchanged file are a dict lookup, no disk or JSON work.
+    _CONFIG_CACHE = {}
+
     @staticmethod
     def load_configuration_from_file(filename):
         print(f"Loading configuration from {filename}...")
-        return ConfigurationManager.DEFAULT_CONFIG
+        try:
+            mtime = os.stat(filename).st_mtime
+        except OSError:
+            return ConfigurationManager.DEFAULT_CONFIG
+
+        key = (filename, mtime)
+        cached = ConfigurationManager._CONFIG_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            with open(filename) as f:
+                loaded = json.load(f)
+        except (OSError, ValueError):
+            return ConfigurationManager.DEFAULT_CONFIG
+
+        config = dict(ConfigurationManager.DEFAULT_CONFIG)
+        bindings = dict(config['key_bindings'])
+        bindings.update(loaded.get('key_bindings', {}))
+        config.update(loaded)
+        config['key_bindings'] = bindings
+        ConfigurationManager._CONFIG_CACHE[key] = config
+        return config
 
     @staticmethod
     def save_configuration_to_file(filename, config):
         print(f"Saving configuration to {filename}...")
+        try:
+            with open(filename, 'w') as f:
+                json.dump(dict(config), f, indent=2)
+        except OSError:
+            return False
+        ConfigurationManager._CONFIG_CACHE = {
+            k: v for k, v in ConfigurationManager._CONFIG_CACHE.items()
+            if k[0] != filename}
         return True
     
     @staticmethod
@@ -1573,6 +2187,21 @@ class ConfigurationManager:
         print("Resetting configuration to factory defaults...")
         return ConfigurationManager.DEFAULT_CONFIG
 
-if __name__ == "__main__":
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    # Fast paths: answer and exit before paying for app construction
+    # (screen buffer, input thread, stdlib cache).
+    if '--version' in args:
+        print(f"CombinatorX {Constants.VERSION}")
+        return 0
+    if '--help' in args or '-h' in args:
+        print("CombinatorX - Logic Workbench")
+        print("usage: CombinatorX.py [--version] [--help]")
+        print("Runs the interactive combinator calculus TUI.")
+        return 0
     app = CombinatorApp()
     app.run()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())